@@ -0,0 +1,20 @@
+import os
+import uvicorn
+
+# Spawned worker processes (uvicorn's and the PDF page pool's) re-run this module as
+# __mp_main__, so it stays free of heavy imports; the app itself is loaded by uvicorn
+if __name__ == "__main__":
+    from app.processor.document_processor import web_concurrency
+
+    # Client sessions live in process memory, so only raise WEB_CONCURRENCY behind
+    # a load balancer that pins each client to one worker
+    reload = os.environ.get("RELOAD", "").lower() in ("1", "true")
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=1 if reload else web_concurrency(),
+        loop="uvloop",
+        http="httptools",
+        reload=reload
+    )
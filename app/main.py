@@ -1,23 +1,33 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import List, Dict
-import uvicorn
-import os
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from typing import BinaryIO, List, Dict, Optional, Tuple
+from contextlib import asynccontextmanager
+import asyncio
 import logging
-import tempfile
-import io
-import PyPDF2
+import threading
+import orjson
+from collections import OrderedDict
 from docx import Document
-from app.processor.document_processor import DocumentProcessor
-from app.processor.rule_extractor import RuleExtractor
+from app.processor.document_processor import DocumentProcessor, file_digest, get_model
+from app.processor.rule_extractor import get_rule_extractor, DEFAULT_RULES_TEXT
+from app.processor.pdf_extractor import extract_pdf_text, shutdown_executor
 from app.models.rule_schema import StyleRule, RuleCategory, RuleType
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Style Guide Checker")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the embedding model (shared by every client's DocumentProcessor) and the rule
+    # extractor at startup rather than on import, so importing this module stays cheap
+    get_model()
+    get_rule_extractor()
+    yield
+    shutdown_executor()
+
+app = FastAPI(title="Style Guide Checker", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -28,10 +38,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize processors
-doc_processor = DocumentProcessor()
-rule_extractor = RuleExtractor()
-
 def validate_pdf(filename: str, content_type: str) -> bool:
     """Validate PDF file."""
     if not filename.lower().endswith('.pdf'):
@@ -60,89 +66,101 @@ def validate_docx(filename: str, content_type: str) -> bool:
         )
     return True
 
-# Add default rules for testing
-default_rules_text = """
-1. Capitalization Rules:
-   - "subject" → "Subject" when used as a noun
-   - "DAIICHI SANKYO" → "Daiichi Sankyo"
-   - "section" → "Section" when referring to document sections
-
-2. Status Terms:
-   - "approved" → "APPROVED"
-   - "completed" → "COMPLETED"
-   - "ongoing" → "ONGOING"
-
-3. Document Types:
-   - "informed consent form" → "ICF"
-   - "clinical study report" → "CSR"
-   - "statistical analysis plan" → "SAP"
-
-4. Section References:
-   - "see section" → "see Section"
-   - "in appendix" → "in Appendix"
-   - "table 1" → "Table 1"
-
-5. Medical Terms:
-   - Use "adverse event" instead of "side effect"
-   - "patient" → "subject" when referring to study participants
-   - "medicine" → "study drug"
-"""
-
-style_guide_processed = False
+# Per-client processors keyed by the X-Client-Id header; least recently used evicted first
+MAX_SESSIONS = 32
+DEFAULT_CLIENT_ID = "default"
+sessions: "OrderedDict[str, DocumentProcessor]" = OrderedDict()
+
+# Parsed style guides keyed by content digest; least recently used evicted first
+RULE_CACHE_SIZE = 16
+rule_cache: "OrderedDict[str, Tuple[Dict[RuleCategory, List[StyleRule]], bytes]]" = OrderedDict()
+# Uploads are parsed in worker threads; the lock covers cache lookups and updates, not parsing
+rule_cache_lock = threading.Lock()
+
+def format_rules(categorized_rules: Dict[RuleCategory, List[StyleRule]]) -> bytes:
+    """Serialize categorized rules to the JSON shape the frontend expects."""
+    formatted_rules = {}
+    for category, rule_list in categorized_rules.items():
+        formatted_rules[category.value] = [
+            {
+                'id': str(rule.id),
+                'pattern': rule.pattern,
+                'replacement': rule.replacement,
+                'type': rule.type,
+                'category': rule.category,
+                'description': rule.description or '',
+                'examples': rule.examples or []
+            }
+            for rule in rule_list
+        ]
+    return orjson.dumps(formatted_rules)
+
+def parse_style_guide(source: BinaryIO) -> Tuple[Dict[RuleCategory, List[StyleRule]], bytes]:
+    """Extract and categorize the rules of a style guide PDF, along with their JSON payload.
+
+    Results are cached by file content, so re-uploading a guide skips parsing and serialization.
+    The upload is hashed block by block from its spooled file and only read into memory on a miss.
+    """
+    digest = file_digest(source)
+    with rule_cache_lock:
+        entry = rule_cache.get(digest)
+        if entry is not None:
+            rule_cache.move_to_end(digest)
+            logger.info(f"Reusing cached rules for style guide {digest}")
+            return entry
+    
+    content = source.read()
+    
+    # Extract text from page 6 onwards (index 5), pages spread across worker processes
+    text = extract_pdf_text(content, start_page=5)
+    
+    # For testing, add default rules if the extracted text is too short
+    if len(text.strip()) < 100:
+        text = DEFAULT_RULES_TEXT
+    
+    rule_extractor = get_rule_extractor()
+    rules = rule_extractor.extract_rules(text)
+    categorized_rules = rule_extractor.categorize_rules(rules)
+    
+    entry = (categorized_rules, format_rules(categorized_rules))
+    with rule_cache_lock:
+        rule_cache[digest] = entry
+        if len(rule_cache) > RULE_CACHE_SIZE:
+            rule_cache.popitem(last=False)
+    return entry
 
 @app.post("/upload/style-guide")
-async def upload_style_guide(file: UploadFile = File(...)):
-    global style_guide_processed
+async def upload_style_guide(file: UploadFile = File(...), x_client_id: Optional[str] = Header(None)):
+    client_id = x_client_id or DEFAULT_CLIENT_ID
     try:
         logger.info(f"Received style guide file: {file.filename} (type: {file.content_type})")
         
         # Validate PDF file
         validate_pdf(file.filename, file.content_type)
         
-        # Read the uploaded file content
-        content = await file.read()
-        
-        # Create a PDF reader object using BytesIO
-        pdf_file = io.BytesIO(content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        # Extract text from page 6 onwards
-        text = ""
-        for page_num in range(5, len(pdf_reader.pages)):  # Start from index 5 (6th page)
-            text += pdf_reader.pages[page_num].extract_text()
-            
-        # For testing, add default rules if the extracted text is too short
-        if len(text.strip()) < 100:
-            text = default_rules_text
-        
-        # Extract and categorize rules
-        rules = rule_extractor.extract_rules(text)
-        categorized_rules = rule_extractor.categorize_rules(rules)
-        doc_processor.process_style_guide(content, categorized_rules)
-        style_guide_processed = True
+        # Extract and categorize rules (cached per file content), reading from the upload's spooled file
+        await file.seek(0)
+        categorized_rules, rules_json = await asyncio.to_thread(parse_style_guide, file.file)
         
-        # Convert rules to dictionary format for frontend
-        formatted_rules = {}
-        for category, rule_list in categorized_rules.items():
-            formatted_rules[category] = [
-                {
-                    'id': str(rule.id),
-                    'pattern': rule.pattern,
-                    'replacement': rule.replacement,
-                    'type': rule.type,
-                    'category': rule.category,
-                    'description': rule.description or '',
-                    'examples': rule.examples or []
-                }
-                for rule in rule_list
-            ]
+        # Build a fresh processor and swap it in, so CSR requests already running
+        # for this client keep using the style guide they started with
+        doc_processor = DocumentProcessor()
+        await asyncio.to_thread(doc_processor.process_style_guide, categorized_rules)
+        sessions[client_id] = doc_processor
+        sessions.move_to_end(client_id)
+        if len(sessions) > MAX_SESSIONS:
+            sessions.popitem(last=False)
         
-        return {
-            "filename": file.filename,
-            "status": "success",
-            "message": "Style guide processed successfully",
-            "rules": formatted_rules
-        }
+        # Embed the pre-serialized rules as-is instead of re-encoding them per response
+        return Response(
+            content=orjson.dumps({
+                "filename": file.filename,
+                "status": "success",
+                "message": "Style guide processed successfully",
+                "rules": orjson.Fragment(rules_json)
+            }),
+            media_type="application/json"
+        )
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -153,33 +171,32 @@ async def upload_style_guide(file: UploadFile = File(...)):
         )
 
 @app.post("/upload/csr")
-async def upload_csr(file: UploadFile = File(...)):
-    global style_guide_processed
+async def upload_csr(file: UploadFile = File(...), x_client_id: Optional[str] = Header(None)):
+    client_id = x_client_id or DEFAULT_CLIENT_ID
     try:
         logger.info(f"Received CSR file: {file.filename} (type: {file.content_type})")
         
         # Validate DOCX file
         validate_docx(file.filename, file.content_type)
         
-        if not style_guide_processed:
+        doc_processor = sessions.get(client_id)
+        if doc_processor is None:
             raise HTTPException(
                 status_code=400,
                 detail="Please upload a style guide first"
             )
+        sessions.move_to_end(client_id)
         
-        # Create a temporary file to store the uploaded content
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file.flush()
-            
-            # Process the CSR document
-            results = doc_processor.process_csr(temp_file.name)
-            
-            # Clean up
-            os.unlink(temp_file.name)
-            
-            return results
+        # Parse straight from the upload's spooled file (kept on disk once it grows
+        # past Starlette's spool size) rather than buffering the whole body in memory
+        await file.seek(0)
+        
+        # Process the CSR document
+        results = await asyncio.to_thread(doc_processor.process_csr, file.file)
+        
+        # Hand the results straight to orjson, which encodes the rule dataclasses natively,
+        # instead of letting FastAPI walk them through jsonable_encoder first
+        return ORJSONResponse(results)
             
     except HTTPException as e:
         raise e
@@ -193,6 +210,3 @@ async def upload_csr(file: UploadFile = File(...)):
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
-
-if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
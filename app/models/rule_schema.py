@@ -1,3 +1,4 @@
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import List, Dict
 from pydantic import BaseModel, Field
@@ -35,3 +36,29 @@ class StyleRule(BaseModel):
 
     class Config:
         use_enum_values = True
+
+@dataclass(slots=True, frozen=True)
+class StyleRuleRecord:
+    """Read-only copy of a validated StyleRule, as kept next to the FAISS index."""
+    id: str
+    category: str
+    type: str
+    description: str
+    pattern: str
+    replacement: str
+    examples: List[str] = field(default_factory=list)
+    context: Dict = field(default_factory=dict)
+
+    @classmethod
+    def from_rule(cls, rule: StyleRule) -> "StyleRuleRecord":
+        """Copy a StyleRule's fields without revalidating them."""
+        return cls(
+            id=rule.id,
+            category=rule.category,
+            type=rule.type,
+            description=rule.description,
+            pattern=rule.pattern,
+            replacement=rule.replacement,
+            examples=rule.examples,
+            context=rule.context
+        )
@@ -0,0 +1,102 @@
+from typing import BinaryIO, Dict, List, Union
+from lxml import etree
+import zipfile
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+BODY = W + "body"
+P = W + "p"
+R = W + "r"
+HYPERLINK = W + "hyperlink"
+TBL = W + "tbl"
+TR = W + "tr"
+TC = W + "tc"
+T = W + "t"
+BR = W + "br"
+
+# Run children that stand for fixed text; w:t and w:br are handled separately
+RUN_CHARACTERS = {W + "tab": "\t", W + "ptab": "\t", W + "cr": "\n", W + "noBreakHyphen": "-"}
+
+def _run_text(run: etree._Element) -> str:
+    """Text of a w:r element, with tabs and line breaks as characters."""
+    parts = []
+    for child in run:
+        if child.tag == T:
+            parts.append(child.text or "")
+        elif child.tag == BR:
+            # Page and column breaks carry no text
+            if child.get(W + "type", "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif child.tag in RUN_CHARACTERS:
+            parts.append(RUN_CHARACTERS[child.tag])
+    return "".join(parts)
+
+def _paragraph_text(paragraph: etree._Element) -> str:
+    """Text of a w:p element from its runs, including runs inside hyperlinks."""
+    parts = []
+    for child in paragraph:
+        if child.tag == R:
+            parts.append(_run_text(child))
+        elif child.tag == HYPERLINK:
+            parts.extend(_run_text(run) for run in child.iterchildren(R))
+    return "".join(parts)
+
+def _cell_properties(cell: etree._Element) -> tuple:
+    """Return a w:tc element's (grid span, whether it continues a vertical merge)."""
+    span = cell.find(f"{W}tcPr/{W}gridSpan")
+    v_merge = cell.find(f"{W}tcPr/{W}vMerge")
+    return (
+        int(span.get(W + "val")) if span is not None else 1,
+        v_merge is not None and v_merge.get(W + "val", "continue") == "continue"
+    )
+
+def _table_cell_texts(table: etree._Element) -> List[str]:
+    """Text of every cell in a w:tbl, row by row, one entry per layout-grid column.
+
+    A cell spanning columns repeats once per column, and a cell continuing a vertical
+    merge repeats the text of the cell it continues.
+    """
+    texts = []
+    above: Dict[int, str] = {}
+    for row in table.iterchildren(TR):
+        before = row.find(f"{W}trPr/{W}gridBefore")
+        offset = int(before.get(W + "val")) if before is not None else 0
+        current: Dict[int, str] = {}
+        for cell in row.iterchildren(TC):
+            span, continues = _cell_properties(cell)
+            if continues:
+                text = above.get(offset, "")
+            else:
+                text = "\n".join(_paragraph_text(p) for p in cell.iterchildren(P))
+            for column in range(offset, offset + span):
+                current[column] = text
+                texts.append(text)
+            offset += span
+        above = current
+    return texts
+
+def extract_docx_text(source: Union[str, BinaryIO]) -> str:
+    """Extract body paragraphs, then table cells, from a DOCX path or binary stream.
+
+    Streams word/document.xml out of the archive instead of building python-docx's
+    object model; the output matches Document(...).paragraphs followed by
+    Document(...).tables, skipping blank entries and joining with newlines.
+    """
+    paragraphs = []
+    cells = []
+    with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as document:
+        for _, element in etree.iterparse(document, events=("end",), tag=(P, TBL)):
+            parent = element.getparent()
+            if parent is None or parent.tag != BODY:
+                # Paragraphs inside tables are read with their table
+                continue
+            if element.tag == P:
+                text = _paragraph_text(element)
+                if text.strip():
+                    paragraphs.append(text)
+            else:
+                cells.extend(text for text in _table_cell_texts(element) if text.strip())
+            # Drop finished body content so memory stays flat on long documents
+            element.clear()
+            while element.getprevious() is not None:
+                del parent[0]
+    return "\n".join(paragraphs + cells)
@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+import multiprocessing
+import io
+import os
+import threading
+from pypdf import PdfReader
+
+# Below this many pages the worker round-trip costs more than it saves
+PARALLEL_MIN_PAGES = 8
+PDF_WORKERS = os.cpu_count() or 1
+
+_executor: Optional[ProcessPoolExecutor] = None
+# Uploads extract PDFs from several threads; only one of them may create the pool
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Lazily create the shared page-extraction pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawn rather than fork: the parent holds torch/FAISS thread pools
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+def shutdown_executor() -> None:
+    """Stop the page-extraction pool, if one was started."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+def _extract_page_range(content: bytes, pages: range) -> str:
+    """Extract the text of a contiguous range of PDF pages, parsing the file once."""
+    pdf_reader = PdfReader(io.BytesIO(content))
+    return "".join(pdf_reader.pages[page_num].extract_text() for page_num in pages)
+
+def extract_pdf_text(content: bytes, start_page: int = 0) -> str:
+    """Extract text from every page from start_page onwards, in parallel for large PDFs."""
+    pdf_reader = PdfReader(io.BytesIO(content))
+    page_numbers = range(start_page, len(pdf_reader.pages))
+
+    if len(page_numbers) < PARALLEL_MIN_PAGES:
+        return "".join(pdf_reader.pages[page_num].extract_text() for page_num in page_numbers)
+
+    # One contiguous range per worker, so each worker unpickles and parses the file once
+    step = -(-len(page_numbers) // PDF_WORKERS)
+    ranges = [page_numbers[i:i + step] for i in range(0, len(page_numbers), step)]
+    return "".join(_get_executor().map(partial(_extract_page_range, content), ranges))
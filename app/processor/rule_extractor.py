@@ -1,12 +1,68 @@
 import re
+import functools
 from typing import List, Dict
 import spacy
+import ahocorasick
 from app.models.rule_schema import StyleRule, RuleCategory, RuleType
 import uuid
 
+# Lines that open a new heading or list item rather than continue a wrapped one
+BLOCK_START = re.compile(r'\s*(?:[-•]|\d+\.)')
+
+def join_wrapped_lines(text: str) -> List[str]:
+    """Join lines the PDF wrapped back into the heading or list item they belong to.
+
+    A blank line or a line starting with -, • or a number like "2." starts a new item;
+    any other line continues the one before it.
+    """
+    items = []
+    current = []
+    for line in text.splitlines():
+        if not line.strip() or BLOCK_START.match(line):
+            if current:
+                items.append(" ".join(current))
+            current = []
+        if line.strip():
+            current.append(line.strip())
+    if current:
+        items.append(" ".join(current))
+    return items
+
+# Default rules, used for testing when a style guide yields too little text
+DEFAULT_RULES_TEXT = """
+1. Capitalization Rules:
+   - "subject" → "Subject" when used as a noun
+   - "DAIICHI SANKYO" → "Daiichi Sankyo"
+   - "section" → "Section" when referring to document sections
+
+2. Status Terms:
+   - "approved" → "APPROVED"
+   - "completed" → "COMPLETED"
+   - "ongoing" → "ONGOING"
+
+3. Document Types:
+   - "informed consent form" → "ICF"
+   - "clinical study report" → "CSR"
+   - "statistical analysis plan" → "SAP"
+
+4. Section References:
+   - "see section" → "see Section"
+   - "in appendix" → "in Appendix"
+   - "table 1" → "Table 1"
+
+5. Medical Terms:
+   - Use "adverse event" instead of "side effect"
+   - "patient" → "subject" when referring to study participants
+   - "medicine" → "study drug"
+"""
+
 class RuleExtractor:
     def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
+        # Only sentence boundaries are used: a blank English pipeline (tokenizer only, no
+        # trained model to load) with the rule-based sentencizer splitting sentences. It
+        # breaks on punctuation alone, so extract_rules feeds it one list item at a time
+        self.nlp = spacy.blank("en")
+        self.nlp.add_pipe("sentencizer")
         self.category_keywords = {
             RuleCategory.STRUCTURE: {
                 'keywords': ["section", "heading", "table", "format", "layout", "indent", "margin", "page", "paragraph", "list"],
@@ -42,6 +98,18 @@ class RuleExtractor:
             }
         }
         
+        # All category keywords in one automaton, so a rule's text is scanned once;
+        # a category scores one point per distinct keyword of its own that occurs
+        self.keyword_automaton = ahocorasick.Automaton()
+        for info in self.category_keywords.values():
+            for keyword in info['keywords']:
+                self.keyword_automaton.add_word(keyword.lower(), keyword.lower())
+        self.keyword_automaton.make_automaton()
+        self.category_keyword_sets = {
+            category: {keyword.lower() for keyword in info['keywords']}
+            for category, info in self.category_keywords.items()
+        }
+        
         # Enhanced rule patterns
         self.rule_patterns = [
             # Direct replacements with arrows
@@ -82,23 +150,38 @@ class RuleExtractor:
             r'(?i)Abbreviate\s*["\'](?P<pattern>.*?)["\'](?:\s+as\s+)["\'](?P<replacement>.*?)["\']',
             r'(?i)The\s+abbreviation\s*["\'](?P<pattern>.*?)["\'](?:\s+stands\s+for\s+)["\'](?P<replacement>.*?)["\']',
         ]
+        # Compiled once here rather than looked up in re's cache for every sentence. Patterns
+        # without both a pattern and a replacement group can never yield a rule, so they are
+        # not run at all
+        self.compiled_rule_patterns = [
+            compiled_pattern
+            for compiled_pattern in map(re.compile, self.rule_patterns)
+            if {'pattern', 'replacement'} <= compiled_pattern.groupindex.keys()
+        ]
 
     def extract_rules(self, text: str) -> List[Dict]:
         """Extract rules from text using regex patterns."""
         rules = []
-        doc = self.nlp(text)
+        # The sentencizer only breaks on punctuation, while the guide lays rules out one per
+        # heading or list item; split those first so they are never merged into one, and
+        # rejoin the lines the PDF wrapped within them
+        items = join_wrapped_lines(text)
+        sentences = (sent for doc in self.nlp.pipe(items) for sent in doc.sents)
         
         # Extract rules using patterns
-        for sent in doc.sents:
+        for sent in sentences:
             sent_text = sent.text.strip()
             
             # Skip empty sentences
             if not sent_text:
                 continue
             
+            # The category depends only on the sentence, so score it once for all its matches
+            category = self._determine_rule_category(sent_text)
+            
             # Try different rule patterns
-            for pattern in self.rule_patterns:
-                matches = re.finditer(pattern, sent_text)
+            for pattern in self.compiled_rule_patterns:
+                matches = pattern.finditer(sent_text)
                 for match in matches:
                     try:
                         rule = {
@@ -108,7 +191,7 @@ class RuleExtractor:
                             'description': sent_text,
                             'examples': [],
                             'type': self._determine_rule_type(match.group('pattern'), match.group('replacement')),
-                            'category': self._determine_rule_category(sent_text)
+                            'category': category
                         }
                         rules.append(rule)
                     except (IndexError, AttributeError):
@@ -131,12 +214,12 @@ class RuleExtractor:
 
     def _determine_rule_category(self, text: str) -> RuleCategory:
         """Determine the category of a rule based on its text."""
-        text = text.lower()
+        found = {keyword for _, keyword in self.keyword_automaton.iter(text.lower())}
         max_score = 0
         best_category = RuleCategory.FORMATTING  # Default category
         
-        for category, info in self.category_keywords.items():
-            score = sum(1 for keyword in info['keywords'] if keyword.lower() in text)
+        for category, keywords in self.category_keyword_sets.items():
+            score = len(keywords & found)
             if score > max_score:
                 max_score = score
                 best_category = category
@@ -162,3 +245,8 @@ class RuleExtractor:
             categorized[style_rule.category].append(style_rule)
         
         return categorized
+
+@functools.lru_cache(maxsize=1)
+def get_rule_extractor() -> RuleExtractor:
+    """Build the rule extractor once per process; every upload shares it."""
+    return RuleExtractor()
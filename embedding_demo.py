@@ -24,17 +24,18 @@ def demonstrate_embeddings():
     
     # 3. Create embeddings
     logger.info("Creating embeddings...")
-    embeddings = model.encode(text_chunks)
+    embeddings = model.encode(text_chunks).astype('float32')
+    faiss.normalize_L2(embeddings)  # Unit length, so inner product is cosine similarity
     logger.info(f"Embedding shape: {embeddings.shape}")  # Should be (6, 384)
     
     # 4. Initialize FAISS index
     logger.info("Initializing FAISS index...")
     dimension = embeddings.shape[1]  # 384 for this model
-    index = faiss.IndexFlatL2(dimension)
+    index = faiss.IndexFlatIP(dimension)
     
     # 5. Add embeddings to index
     logger.info("Adding embeddings to FAISS index...")
-    index.add(embeddings.astype('float32'))
+    index.add(embeddings)
     
     # 6. Test queries
     test_queries = [
@@ -45,22 +46,18 @@ def demonstrate_embeddings():
     
     # 7. Search similar rules
     logger.info("\nTesting queries...")
-    query_embeddings = model.encode(test_queries)
+    query_embeddings = model.encode(test_queries).astype('float32')
+    faiss.normalize_L2(query_embeddings)
     
-    # 8. For each query, find the most similar rules
+    # 8. Find the most similar rules for every query in one batched search
     k = 2  # Number of similar results to return
-    for i, query in enumerate(test_queries):
+    D, I = index.search(query_embeddings, k)
+    for query, similarities, indices in zip(test_queries, D, I):
         logger.info(f"\nQuery: {query}")
         
-        # Get distances and indices of similar items
-        D, I = index.search(
-            query_embeddings[i:i+1].astype('float32'),
-            k
-        )
-        
         # Show results
-        for dist, idx in zip(D[0], I[0]):
-            logger.info(f"Match (distance={dist:.2f}): {text_chunks[idx]}")
+        for sim, idx in zip(similarities, indices):
+            logger.info(f"Match (similarity={sim:.2f}): {text_chunks[idx]}")
 
 if __name__ == "__main__":
     demonstrate_embeddings()
@@ -1,12 +1,10 @@
 from app.processor.rule_extractor import RuleExtractor
-from PyPDF2 import PdfReader
+from pypdf import PdfReader
 
 def main():
     # Read PDF
     pdf = PdfReader('styleexample/GP-RA005_Suppl.1_Global English-Language House Style Guide.pdf')
-    text = ''
-    for page in pdf.pages:
-        text += page.extract_text()
+    text = ''.join(page.extract_text() for page in pdf.pages)
     
     # Extract rules
     extractor = RuleExtractor()
@@ -2,6 +2,34 @@ import axios from 'axios';
 
 const API_BASE_URL = 'http://127.0.0.1:8001';
 
+const CLIENT_ID_KEY = 'styleGuideClientId';
+let clientId;
+
+// Identifies this browser tab so the backend keeps its style guide separate from other users'.
+// Created on first upload (crypto.randomUUID only exists in secure contexts, so plain-HTTP
+// deployments fall back to a random string) and kept in sessionStorage so a reload keeps
+// the tab's server-side session.
+const getClientId = () => {
+  if (clientId) {
+    return clientId;
+  }
+  try {
+    clientId = sessionStorage.getItem(CLIENT_ID_KEY);
+  } catch (error) {
+    // Storage can be blocked by privacy settings; fall through to a new id
+  }
+  if (!clientId) {
+    clientId = globalThis.crypto?.randomUUID?.()
+      ?? `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    try {
+      sessionStorage.setItem(CLIENT_ID_KEY, clientId);
+    } catch (error) {
+      // Not persisted; the id lasts until a reload
+    }
+  }
+  return clientId;
+};
+
 export const uploadFile = async (endpoint, file) => {
   const formData = new FormData();
   formData.append('file', file);
@@ -10,6 +38,7 @@ export const uploadFile = async (endpoint, file) => {
     const response = await axios.post(`${API_BASE_URL}${endpoint}`, formData, {
       headers: {
         'Content-Type': 'multipart/form-data',
+        'X-Client-Id': getClientId(),
       },
     });
     return response.data;
@@ -39,14 +39,10 @@ def main():
         print("\nCorrected Text:")
         print(result["corrected_text"])
         print("\nChanges Made:")
-        if "matches" in result:
-            for match in result["matches"]:
-                print(f"Rule: {match['rule']['description']}")
-                for change in match["changes"]:
-                    print(f"- {change}")
-        else:
-            for change in result["changes"]:
-                print(f"- {change}")
+        for match in result.get("matches", []):
+            print(f"Rule: {match['rule']['description']}")
+        for change in result["changes"]:
+            print(f"- {change}")
         print("-" * 80)
 
 def run_all_tests():
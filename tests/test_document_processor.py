@@ -0,0 +1,206 @@
+import io
+import os
+import re
+import types
+import unittest
+from unittest import mock
+
+from docx import Document
+
+from app.processor import document_processor
+from app.processor.document_processor import (
+    DocumentProcessor, build_automaton, model_cache_token, split_literal_rules, web_concurrency
+)
+
+class TestWebConcurrency(unittest.TestCase):
+    def test_web_concurrency(self):
+        """Worker counts fall back to 1 unless WEB_CONCURRENCY holds a positive integer"""
+        test_cases = [("4", 4), (" 2 ", 2), ("", 1), ("auto", 1), ("0", 1), ("-3", 1)]
+        for value, expected in test_cases:
+            with self.subTest(value=value), mock.patch.dict(os.environ, {"WEB_CONCURRENCY": value}):
+                self.assertEqual(web_concurrency(), expected)
+        with mock.patch.dict(os.environ):
+            os.environ.pop("WEB_CONCURRENCY", None)
+            self.assertEqual(web_concurrency(), 1)
+
+class TestEmbeddings(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.processor = DocumentProcessor()
+
+    def test_model_cache_token(self):
+        """Each model keeps one token, and no two models share it"""
+        first, second = types.SimpleNamespace(), types.SimpleNamespace()
+        self.assertEqual(model_cache_token(first), model_cache_token(first))
+        self.assertNotEqual(model_cache_token(first), model_cache_token(second))
+        self.assertEqual(self.processor.model_token, model_cache_token(self.processor.model))
+
+    def test_empty_texts(self):
+        """No texts give an empty float32 matrix of the model's width"""
+        embeddings = self.processor.embed_texts([])
+        dimension = self.processor.model.get_sentence_embedding_dimension()
+        self.assertEqual(embeddings.shape, (0, dimension))
+        self.assertEqual(embeddings.dtype, 'float32')
+
+    def test_cached_embeddings(self):
+        """Repeated texts come back unchanged from the cache"""
+        first = self.processor.embed_texts(["study drug", "placebo"])
+        second = self.processor.embed_texts(["placebo", "study drug"])
+        self.assertEqual(first.tolist(), second[::-1].tolist())
+
+class TestLiteralRules(unittest.TestCase):
+    # Rules are listed in the order the rule table would list them
+    rules = [
+        (re.compile(r'\bfda\b', re.IGNORECASE), 'FDA'),
+        (re.compile(r'\bbase-line\b', re.IGNORECASE), 'baseline'),
+        (re.compile(r'\bfollow-up\b', re.IGNORECASE), 'follow-up'),
+        (re.compile(r'\bfollow\b', re.IGNORECASE), 'Follow'),
+        (re.compile(r'\bup\b', re.IGNORECASE), 'UP'),
+        (re.compile(r'\bcase\b'), 'Case'),
+        (re.compile(r'\bday\s+1\b', re.IGNORECASE), 'Day 1'),
+        (re.compile(r'\bvia\b', re.IGNORECASE), lambda match: 'via'),
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.literal_needles, cls.regex_patterns = split_literal_rules(cls.rules)
+        # The literal pass only needs the rule table and its automaton, not a model
+        cls.processor = types.SimpleNamespace(
+            compiled_corrections=cls.rules,
+            literal_automaton=build_automaton(cls.literal_needles),
+        )
+
+    def apply(self, text):
+        applied = set()
+        corrected = DocumentProcessor.apply_literal_corrections(self.processor, text, applied)
+        return corrected, applied
+
+    def test_split_literal_rules(self):
+        """Only case-insensitive whole-word rules with plain replacements become literals"""
+        self.assertEqual(self.literal_needles, {0: 'fda', 1: 'base-line', 2: 'follow-up', 3: 'follow', 4: 'up'})
+        self.assertEqual(sorted(self.regex_patterns), [5, 6, 7])
+        self.assertIs(self.regex_patterns[5], self.rules[5][0])
+
+    def test_literal_corrections(self):
+        """Literals match in any case as whole words, next to ASCII and non-ASCII text alike"""
+        test_cases = [
+            ("fda Fda fDA FDA", "FDA FDA FDA FDA", {0}),
+            ("Base-Line and base-line", "baseline and baseline", {1}),
+            ("fda-approved (fda), fda.", "FDA-approved (FDA), FDA.", {0}),
+            ("fdaé éfda fda_x fda1 xfda", "fdaé éfda fda_x fda1 xfda", set()),
+            ("café fda", "café FDA", {0}),
+            ("the FDA", "the FDA", set()),
+        ]
+        for input_text, expected, expected_applied in test_cases:
+            with self.subTest(input_text=input_text):
+                self.assertEqual(self.apply(input_text), (expected, expected_applied))
+
+    def test_overlapping_matches(self):
+        """The leftmost match wins, then the earlier rule; adjacent matches are all replaced"""
+        test_cases = [
+            ("follow-up visit", "follow-up visit", set()),
+            ("Follow-Up visit", "follow-up visit", {2}),
+            ("follow up", "Follow UP", {3, 4}),
+            ("up-fda", "UP-FDA", {0, 4}),
+            ("fda,fda fda", "FDA,FDA FDA", {0}),
+        ]
+        for input_text, expected, expected_applied in test_cases:
+            with self.subTest(input_text=input_text):
+                self.assertEqual(self.apply(input_text), (expected, expected_applied))
+
+class TestChunkText(unittest.TestCase):
+    def chunk(self, text, chunk_size):
+        # Chunking only reads chunk_size, so no model is needed
+        return DocumentProcessor.chunk_text(types.SimpleNamespace(chunk_size=chunk_size), text)
+
+    def test_chunk_size_boundaries(self):
+        """A chunk takes every whole sentence ending within chunk_size characters"""
+        text = "Aaaa. Bbbb. Cccc."
+        test_cases = [
+            (17, [text]),
+            (16, ["Aaaa. Bbbb.", "Cccc."]),
+            (11, ["Aaaa. Bbbb.", "Cccc."]),
+            (10, ["Aaaa.", "Bbbb.", "Cccc."]),
+        ]
+        for chunk_size, expected in test_cases:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.chunk(text, chunk_size), expected)
+
+    def test_oversized_sentences(self):
+        """A sentence longer than chunk_size becomes a chunk of its own"""
+        self.assertEqual(
+            self.chunk("A very long first sentence here. Short.", 10),
+            ["A very long first sentence here.", "Short."]
+        )
+        self.assertEqual(
+            self.chunk("Short. A very long second sentence here.", 10),
+            ["Short.", "A very long second sentence here."]
+        )
+
+    def test_terminator_runs(self):
+        """Runs of terminators such as ?! and ... end one sentence"""
+        test_cases = [
+            ("Really?! Yes... Done.", 9, ["Really?!", "Yes...", "Done."]),
+            ("Really?! Yes... Done.", 16, ["Really?! Yes...", "Done."]),
+            ("Wait... what?! ok", 8, ["Wait...", "what?!", "ok"]),
+        ]
+        for text, chunk_size, expected in test_cases:
+            with self.subTest(text=text, chunk_size=chunk_size):
+                self.assertEqual(self.chunk(text, chunk_size), expected)
+
+    def test_trailing_text(self):
+        """Text after the last terminator is kept, as its own chunk when it doesn't fit"""
+        test_cases = [
+            ("One. two three", 20, ["One. two three"]),
+            ("One. two three", 6, ["One.", "two three"]),
+            ("no terminator at all here", 5, ["no terminator at all here"]),
+            ("", 5, []),
+        ]
+        for text, chunk_size, expected in test_cases:
+            with self.subTest(text=text, chunk_size=chunk_size):
+                self.assertEqual(self.chunk(text, chunk_size), expected)
+
+def docx_stream(text: str) -> io.BytesIO:
+    document = Document()
+    document.add_paragraph(text)
+    stream = io.BytesIO()
+    document.save(stream)
+    stream.seek(0)
+    return stream
+
+class TestCsrCache(unittest.TestCase):
+    def setUp(self):
+        self.processor = DocumentProcessor()
+        patcher = mock.patch.object(
+            self.processor, "extract_text_from_docx", wraps=self.processor.extract_text_from_docx
+        )
+        self.extract_text = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_stream_twice(self):
+        """The same stream is parsed once, even when the first pass left it at its end"""
+        stream = docx_stream("The fda approved approximately 5mg.")
+        first = self.processor.process_csr(stream)
+        second = self.processor.process_csr(stream)
+        self.assertIs(second, first)
+        self.assertEqual(self.extract_text.call_count, 1)
+        self.assertEqual(stream.tell(), 0)
+        self.assertEqual(first[0]["corrected_text"], "The FDA approved ~5 mg.")
+
+    def test_eviction(self):
+        """The least recently used CSR is parsed again once CSR_CACHE_SIZE others follow it"""
+        streams = [docx_stream(f"Subject {i} received 5mg.") for i in range(document_processor.CSR_CACHE_SIZE + 1)]
+        for stream in streams[:-1]:
+            self.processor.process_csr(stream)
+        self.processor.process_csr(streams[0])
+        self.assertEqual(self.extract_text.call_count, document_processor.CSR_CACHE_SIZE)
+
+        # Adding one more evicts streams[1], now the least recently used
+        self.processor.process_csr(streams[-1])
+        self.processor.process_csr(streams[0])
+        self.assertEqual(self.extract_text.call_count, document_processor.CSR_CACHE_SIZE + 1)
+        self.processor.process_csr(streams[1])
+        self.assertEqual(self.extract_text.call_count, document_processor.CSR_CACHE_SIZE + 2)
+
+if __name__ == '__main__':
+    unittest.main()
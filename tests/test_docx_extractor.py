@@ -0,0 +1,109 @@
+import io
+import unittest
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from app.processor.docx_extractor import extract_docx_text
+
+def save(document) -> io.BytesIO:
+    stream = io.BytesIO()
+    document.save(stream)
+    stream.seek(0)
+    return stream
+
+def python_docx_text(stream: io.BytesIO) -> str:
+    """The text the extractor replaced: python-docx paragraphs, then table cells."""
+    document = Document(stream)
+    stream.seek(0)
+    text = [p.text for p in document.paragraphs if p.text.strip()]
+    for table in document.tables:
+        for row in table.rows:
+            text.extend(cell.text for cell in row.cells if cell.text.strip())
+    return "\n".join(text)
+
+def add_xml(document, xml: str):
+    """Append raw WordprocessingML to the body, for markup python-docx cannot write."""
+    document.element.body.append(parse_xml(xml))
+
+class TestDocxExtractor(unittest.TestCase):
+    def assertExtracts(self, document, expected, matches_python_docx=True):
+        stream = save(document)
+        self.assertEqual(extract_docx_text(stream), expected)
+        if matches_python_docx:
+            self.assertEqual(extract_docx_text(stream), python_docx_text(stream))
+
+    def test_paragraphs_and_breaks(self):
+        """Tabs and line breaks become characters, page breaks and blank paragraphs are dropped"""
+        document = Document()
+        paragraph = document.add_paragraph("Dose")
+        run = paragraph.add_run(" 5 mg")
+        run.add_tab()
+        run.add_text("daily")
+        run.add_break()
+        run.add_text("with food")
+        run.add_break(WD_BREAK.PAGE)
+        document.add_paragraph("   ")
+        document.add_paragraph("Second paragraph.")
+        self.assertExtracts(document, "Dose 5 mg\tdaily\nwith food\nSecond paragraph.")
+
+    def test_merged_cells(self):
+        """Cells merged across columns (gridSpan) or rows (vMerge) repeat per grid cell"""
+        document = Document()
+        document.add_paragraph("Body")
+        table = document.add_table(rows=3, cols=3)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"c{r}{c}"
+        table.cell(0, 0).merge(table.cell(0, 1))
+        table.cell(1, 2).merge(table.cell(2, 2))
+        self.assertExtracts(document, "\n".join([
+            "Body",
+            "c00\nc01", "c00\nc01", "c02",
+            "c10", "c11", "c12\nc22",
+            "c20", "c21", "c12\nc22",
+        ]))
+
+    def test_nested_tables(self):
+        """Tables inside cells are not read on their own, and their text is not part of the cell"""
+        document = Document()
+        table = document.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "outer"
+        table.cell(0, 1).add_table(rows=1, cols=1).cell(0, 0).text = "nested"
+        self.assertExtracts(document, "outer")
+
+    def test_hyperlinks(self):
+        """Runs inside hyperlinks are part of their paragraph's text"""
+        document = Document()
+        add_xml(document, (
+            f'<w:p {nsdecls("w", "r")}>'
+            '<w:r><w:t xml:space="preserve">See </w:t></w:r>'
+            '<w:hyperlink r:id="rId99"><w:r><w:t>the protocol</w:t></w:r></w:hyperlink>'
+            '<w:r><w:t>.</w:t></w:r>'
+            '</w:p>'
+        ))
+        self.assertExtracts(document, "See the protocol.", matches_python_docx=False)
+
+    def test_grid_before(self):
+        """Rows that skip leading grid columns (gridBefore) line up with the rows above"""
+        document = Document()
+        add_xml(document, (
+            f'<w:tbl {nsdecls("w")}>'
+            '<w:tblGrid><w:gridCol/><w:gridCol/><w:gridCol/></w:tblGrid>'
+            '<w:tr>'
+            '<w:tc><w:p><w:r><w:t>a</w:t></w:r></w:p></w:tc>'
+            '<w:tc><w:p><w:r><w:t>b</w:t></w:r></w:p></w:tc>'
+            '<w:tc><w:tcPr><w:vMerge w:val="restart"/></w:tcPr><w:p><w:r><w:t>c</w:t></w:r></w:p></w:tc>'
+            '</w:tr>'
+            '<w:tr><w:trPr><w:gridBefore w:val="1"/></w:trPr>'
+            '<w:tc><w:p><w:r><w:t>d</w:t></w:r></w:p></w:tc>'
+            '<w:tc><w:tcPr><w:vMerge/></w:tcPr><w:p/></w:tc>'
+            '</w:tr>'
+            '</w:tbl>'
+        ))
+        self.assertExtracts(document, "a\nb\nc\nd\nc", matches_python_docx=False)
+
+if __name__ == '__main__':
+    unittest.main()
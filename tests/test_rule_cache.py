@@ -0,0 +1,59 @@
+import io
+import unittest
+from unittest import mock
+
+import orjson
+
+from app import main
+from app.models.rule_schema import RuleCategory
+
+class TestRuleCache(unittest.TestCase):
+    def setUp(self):
+        main.rule_cache.clear()
+        # No real PDF is needed: empty page text falls back to the default rules
+        patcher = mock.patch.object(main, "extract_pdf_text", return_value="")
+        self.extract_pdf_text = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(main.rule_cache.clear)
+
+    def test_cache_hit(self):
+        """Re-uploading the same guide reuses the parsed rules"""
+        first = main.parse_style_guide(io.BytesIO(b"guide"))
+        second = main.parse_style_guide(io.BytesIO(b"guide"))
+        self.assertIs(second, first)
+        self.assertEqual(self.extract_pdf_text.call_count, 1)
+        self.assertEqual(len(main.rule_cache), 1)
+
+    def test_eviction(self):
+        """The least recently used guide is dropped once the cache is full"""
+        with mock.patch.object(main, "RULE_CACHE_SIZE", 2):
+            main.parse_style_guide(io.BytesIO(b"first"))
+            main.parse_style_guide(io.BytesIO(b"second"))
+            main.parse_style_guide(io.BytesIO(b"first"))
+            main.parse_style_guide(io.BytesIO(b"third"))
+            self.assertEqual(len(main.rule_cache), 2)
+            self.assertEqual(self.extract_pdf_text.call_count, 3)
+
+            # "second" was least recently used, so it is parsed again while "first" is not
+            main.parse_style_guide(io.BytesIO(b"first"))
+            self.assertEqual(self.extract_pdf_text.call_count, 3)
+            main.parse_style_guide(io.BytesIO(b"second"))
+            self.assertEqual(self.extract_pdf_text.call_count, 4)
+
+    def test_cached_payload(self):
+        """The cached JSON payload matches the categorized rules it was built from"""
+        main.parse_style_guide(io.BytesIO(b"guide"))
+        categorized_rules, payload = main.parse_style_guide(io.BytesIO(b"guide"))
+        formatted_rules = orjson.loads(payload)
+
+        self.assertEqual(set(formatted_rules), {category.value for category in categorized_rules})
+        for category, rule_list in categorized_rules.items():
+            with self.subTest(category=category):
+                self.assertIsInstance(category, RuleCategory)
+                self.assertEqual(
+                    [(rule['id'], rule['pattern'], rule['replacement']) for rule in formatted_rules[category.value]],
+                    [(str(rule.id), rule.pattern, rule.replacement) for rule in rule_list],
+                )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from app.processor.rule_extractor import RuleExtractor, DEFAULT_RULES_TEXT
+from app.models.rule_schema import RuleCategory, RuleType
+
+class TestRuleExtractor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = RuleExtractor()
+
+    def test_default_rules(self):
+        """Test each line of the default rules yields its own rule"""
+        rules = self.extractor.extract_rules(DEFAULT_RULES_TEXT)
+        self.assertEqual(
+            [(rule['pattern'], rule['replacement'], rule['category'], rule['type']) for rule in rules],
+            [
+                ('- "subject"', '"Subject" when used as a noun', RuleCategory.DOMAIN, RuleType.CASE),
+                ('- "DAIICHI SANKYO"', '"Daiichi Sankyo"', RuleCategory.FORMATTING, RuleType.MULTI),
+                ('- "section"', '"Section" when referring to document sections', RuleCategory.STRUCTURE, RuleType.CASE),
+                ('- "approved"', '"APPROVED"', RuleCategory.FORMATTING, RuleType.CASE),
+                ('- "completed"', '"COMPLETED"', RuleCategory.FORMATTING, RuleType.CASE),
+                ('- "ongoing"', '"ONGOING"', RuleCategory.FORMATTING, RuleType.CASE),
+                ('- "informed consent form"', '"ICF"', RuleCategory.FORMATTING, RuleType.MULTI),
+                ('- "clinical study report"', '"CSR"', RuleCategory.DOMAIN, RuleType.MULTI),
+                ('- "statistical analysis plan"', '"SAP"', RuleCategory.FORMATTING, RuleType.MULTI),
+                ('- "see section"', '"see Section"', RuleCategory.STRUCTURE, RuleType.MULTI),
+                ('- "in appendix"', '"in Appendix"', RuleCategory.REFERENCE, RuleType.MULTI),
+                ('- "table 1"', '"Table 1"', RuleCategory.STRUCTURE, RuleType.MULTI),
+                ('- "patient"', '"subject" when referring to study participants', RuleCategory.DOMAIN, RuleType.CASE),
+                ('- "medicine"', '"study drug"', RuleCategory.DOMAIN, RuleType.CASE),
+            ]
+        )
+        for rule in rules:
+            with self.subTest(pattern=rule['pattern']):
+                self.assertNotIn('\n', rule['description'])
+                self.assertIn(rule['pattern'], rule['description'])
+
+    def test_sentences_within_a_line(self):
+        """Test sentences on one line are still split at their punctuation"""
+        rules = self.extractor.extract_rules('Doses: mg → MG in tables. Volumes: ml → mL in text.')
+        self.assertEqual(
+            [(rule['pattern'], rule['replacement']) for rule in rules],
+            [('Doses: mg', 'MG in tables.'), ('Volumes: ml', 'mL in text.')]
+        )
+
+    def test_wrapped_lines(self):
+        """Test rules the PDF wrapped across lines are joined back together"""
+        test_cases = [
+            ('Replace "side effect" with\n"adverse event" in all sections.', [('side effect', 'adverse event')]),
+            ('Abbreviate "clinical study report"\nas "CSR".', [('clinical study report', 'CSR')]),
+        ]
+        for text, expected in test_cases:
+            with self.subTest(text=text):
+                rules = self.extractor.extract_rules(text)
+                self.assertEqual([(rule['pattern'], rule['replacement']) for rule in rules], expected)
+
+    def test_list_items_stay_apart(self):
+        """Test a wrapped list item ends where the next item or heading starts"""
+        text = (
+            '1. Terms:\n'
+            '   - "patient" → "subject" when referring\n'
+            '     to study participants\n'
+            '   • "medicine" → "study drug"\n'
+            '2. Units:\n'
+            '   - "ml" → "mL"\n'
+        )
+        rules = self.extractor.extract_rules(text)
+        self.assertEqual(
+            [(rule['pattern'], rule['replacement']) for rule in rules],
+            [
+                ('- "patient"', '"subject" when referring to study participants'),
+                ('• "medicine"', '"study drug"'),
+                ('- "ml"', '"mL"'),
+            ]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
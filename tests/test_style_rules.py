@@ -3,8 +3,10 @@ from app.processor.document_processor import DocumentProcessor
 from app.models.rule_schema import RuleCategory
 
 class TestStyleRules(unittest.TestCase):
-    def setUp(self):
-        self.processor = DocumentProcessor()
+    @classmethod
+    def setUpClass(cls):
+        # Corrections are pure functions of the text, so one processor serves every test
+        cls.processor = DocumentProcessor()
 
     def test_document_structure_rules(self):
         """Test document structure rules (sections, headings, tables)"""
@@ -17,8 +19,9 @@ class TestStyleRules(unittest.TestCase):
             ("the results and discussion shows", "the Results and Discussion shows"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_clinical_terms(self):
         """Test clinical and medical terminology rules"""
@@ -32,8 +35,9 @@ class TestStyleRules(unittest.TestCase):
             ("quality of life assessment", "quality of life (QoL) assessment"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_study_phase_formatting(self):
         """Test study phase formatting rules"""
@@ -45,8 +49,9 @@ class TestStyleRules(unittest.TestCase):
             ("phase 4 extension", "Phase 4 extension"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_units_and_numbers(self):
         """Test units and numerical formatting rules"""
@@ -60,8 +65,9 @@ class TestStyleRules(unittest.TestCase):
             ("less than or equal to 50", "≤50"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_statistical_terms(self):
         """Test statistical terminology rules"""
@@ -76,8 +82,9 @@ class TestStyleRules(unittest.TestCase):
             ("hazard ratio showed", "hazard ratio (HR) showed"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_organizations_and_regulatory(self):
         """Test organization and regulatory body formatting"""
@@ -91,8 +98,9 @@ class TestStyleRules(unittest.TestCase):
             ("daiichi sankyo study", "Daiichi Sankyo study"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_time_points(self):
         """Test time point and study period formatting"""
@@ -105,8 +113,9 @@ class TestStyleRules(unittest.TestCase):
             ("during treatment period", "during Treatment Period"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_medical_terms(self):
         """Test common medical term formatting"""
@@ -119,8 +128,9 @@ class TestStyleRules(unittest.TestCase):
             ("pcr test", "PCR test"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_demographics(self):
         """Test demographic term formatting"""
@@ -134,8 +144,9 @@ class TestStyleRules(unittest.TestCase):
             ("female subjects", "Female subjects"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_formatting(self):
         """Test general formatting rules"""
@@ -146,8 +157,24 @@ class TestStyleRules(unittest.TestCase):
             ("etc.and others", "etc. and others"),
         ]
         for input_text, expected in test_cases:
-            corrected, _ = self.processor.apply_style_corrections(input_text)
-            self.assertEqual(corrected, expected)
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
+
+    def test_formatting_after_other_rules(self):
+        """Test formatting rules see the text other rules have already rewritten"""
+        test_cases = [
+            ("vs. approximately 5", "vs. ~5"),
+            ("e.g. approximately 3", "e.g. ~3"),
+            ("etc.\nless than or equal to 50", "etc.\n≤50"),
+            ("i.e. greater than or equal to 10", "i.e. ≥10"),
+            ("see appendix I.E.the", "see Appendix i.e., the"),
+            ("i.e.I.E.the", "i.e., I.E.the"),
+        ]
+        for input_text, expected in test_cases:
+            with self.subTest(input_text=input_text):
+                corrected, _ = self.processor.apply_style_corrections(input_text)
+                self.assertEqual(corrected, expected)
 
     def test_multiple_corrections(self):
         """Test multiple corrections in a single text"""